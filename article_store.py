@@ -0,0 +1,62 @@
+import csv
+import os
+import random
+import threading
+import time
+
+# In-memory copy of the articles CSV. Articles are held in a plain list
+# with an `Article ID` -> position map, so picking a random article or
+# looking one up by ID needs no file access. The file's mtime is checked
+# at most once per `check_interval` seconds and the data is reloaded when
+# it changes.
+class ArticleStore:
+    def __init__(self, csv_path, check_interval=1.0):
+        self.csv_path = csv_path
+        self.check_interval = check_interval
+        self.lock = threading.Lock()
+        self.mtime = None
+        self.checked_at = 0.0
+        self.snapshot = ([], [], {})
+        self.load()
+
+    def load(self):
+        mtime = os.stat(self.csv_path).st_mtime
+        ids = []
+        articles = []
+        with open(self.csv_path, newline='', encoding='utf-8') as file:
+            for row in csv.DictReader(file):
+                article = (row.get('Article') or '').strip()
+                if article:
+                    ids.append(row.get('Article ID', str(len(ids) + 1)).strip())
+                    articles.append(article)
+        positions = {article_id: i for i, article_id in enumerate(ids)}
+        # Swap in the new data in one assignment so readers never see a mix
+        self.snapshot = (ids, articles, positions)
+        self.mtime = mtime
+
+    def refresh(self):
+        now = time.monotonic()
+        if now - self.checked_at < self.check_interval:
+            return
+        with self.lock:
+            if now - self.checked_at < self.check_interval:
+                return
+            self.checked_at = now
+            try:
+                if os.stat(self.csv_path).st_mtime != self.mtime:
+                    self.load()
+            except FileNotFoundError:
+                pass
+
+    def random_article(self):
+        self.refresh()
+        return random.choice(self.snapshot[1])
+
+    def get(self, article_id):
+        self.refresh()
+        _, articles, positions = self.snapshot
+        position = positions.get(str(article_id))
+        return articles[position] if position is not None else None
+
+    def __len__(self):
+        return len(self.snapshot[1])
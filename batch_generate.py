@@ -0,0 +1,177 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+
+# Offline batch mode: generate questions and their top retrieved documents
+# for every article in a CSV/JSONL file and append them to a JSONL file.
+#
+#   python batch_generate.py Templates/articles_dataset.csv -o questions.jsonl
+#
+# Articles are streamed in chunks; each chunk runs as one batched T5 call and
+# one batched MiniLM encode in a worker process. The output doubles as the
+# checkpoint: rerunning the same command skips article IDs already written.
+
+# Function to count the cores this process may run on
+def available_cores():
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+# Function to stream (id, text) pairs from a CSV or JSONL file
+def iter_articles(path):
+    if path.endswith('.jsonl'):
+        with open(path, encoding='utf-8') as file:
+            for number, line in enumerate(file, 1):
+                if line.strip():
+                    record = json.loads(line)
+                    text = record.get('text') or record.get('article') or ''
+                    yield str(record.get('id', number)), text
+        return
+
+    with open(path, newline='', encoding='utf-8') as file:
+        for number, row in enumerate(csv.DictReader(file), 1):
+            text = row.get('Article') or row.get('text') or ''
+            yield str(row.get('Article ID') or row.get('id') or number), text
+
+def iter_chunks(articles, size):
+    articles = iter(articles)
+    while True:
+        chunk = list(islice(articles, size))
+        if not chunk:
+            return
+        yield chunk
+
+# Function to cut a partially written last record (from an interrupted run)
+# off the output, so appended records start on a line of their own
+def truncate_partial_line(output, block_size=65536):
+    if not os.path.exists(output):
+        return
+    with open(output, 'rb+') as file:
+        end = file.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - block_size)
+            file.seek(start)
+            newline = file.read(position - start).rfind(b'\n')
+            if newline != -1:
+                file.truncate(start + newline + 1)
+                return
+            position = start
+        file.truncate(0)
+
+# Function to collect article IDs already present in the output file
+def completed_ids(output):
+    done = set()
+    if not os.path.exists(output):
+        return done
+    with open(output, encoding='utf-8') as file:
+        for line in file:
+            try:
+                done.add(json.loads(line)['id'])
+            except (ValueError, KeyError):
+                pass  # Not a complete record; it is regenerated
+    return done
+
+# Worker initializer: split the cores between processes instead of letting
+# every process start one torch thread per core
+def init_worker(threads):
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+# Corpus index for this worker process, built on its first chunk. Only the
+# model pipeline is imported, never app.py and its web-app state.
+corpus_index = None
+
+def get_corpus_index():
+    global corpus_index
+    if corpus_index is None:
+        import pipeline
+        from corpus import CorpusStore
+        corpus_index = pipeline.build_corpus_index(CorpusStore(pipeline.corpus_sources).snapshot)
+    return corpus_index
+
+def process_chunk(chunk, num_questions, top_k):
+    import pipeline
+    inputs = [(pipeline.build_generation_input(text), num_questions) for _, text in chunk]
+    question_sets = pipeline.run_generation_batch(inputs)
+
+    index = get_corpus_index()
+    questions = [question for question_set in question_sets for question in question_set]
+    embeddings = index.encode(questions) if questions else []
+
+    results = []
+    position = 0
+    for (article_id, text), question_set in zip(chunk, question_sets):
+        items = []
+        for question in question_set:
+            documents = index.search(embeddings[position], top_k=top_k, query_text=question)
+            position += 1
+            items.append({
+                "question": question,
+                "documents": [{"document": doc, "score": score} for doc, score in documents],
+            })
+        results.append({"id": article_id, "article": text, "questions": items})
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate questions and evidence for a whole article file.')
+    parser.add_argument('input', help='CSV (Article ID, Article) or JSONL (id, text) file')
+    parser.add_argument('-o', '--output', required=True, help='JSONL file to append results to')
+    parser.add_argument('--num-questions', type=int, default=5)
+    parser.add_argument('--top-k', type=int, default=3)
+    parser.add_argument('--chunk-size', type=int, default=16, help='articles per batched model call')
+    parser.add_argument('--workers', type=int, default=available_cores())
+    parser.add_argument('--restart', action='store_true', help='ignore existing output and start over')
+    args = parser.parse_args()
+
+    if args.restart and os.path.exists(args.output):
+        os.remove(args.output)
+    truncate_partial_line(args.output)
+    done = completed_ids(args.output)
+    articles = (
+        (article_id, text) for article_id, text in iter_articles(args.input)
+        if text.strip() and article_id not in done
+    )
+    if done:
+        print(f"Resuming: skipping {len(done)} articles already in {args.output}")
+
+    threads = max(1, available_cores() // args.workers)
+    start = time.perf_counter()
+    processed = 0
+    with open(args.output, 'a', encoding='utf-8') as output, ProcessPoolExecutor(
+        max_workers=args.workers, initializer=init_worker, initargs=(threads,)
+    ) as pool:
+        chunks = iter_chunks(articles, args.chunk_size)
+        running = set()
+        while True:
+            # Keep a bounded number of chunks in flight so input is streamed
+            while len(running) < args.workers * 2:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                running.add(pool.submit(process_chunk, chunk, args.num_questions, args.top_k))
+            if not running:
+                break
+            finished, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                for record in future.result():
+                    output.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    processed += 1
+                output.flush()
+            elapsed = time.perf_counter() - start
+            print(f"{processed} articles, {processed / elapsed:.2f} articles/s", file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    rate = processed / elapsed if elapsed else 0
+    print(f"Done: {processed} articles in {elapsed:.1f}s ({rate:.2f} articles/s)")
+
+if __name__ == '__main__':
+    main()
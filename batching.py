@@ -0,0 +1,79 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import metrics
+
+# Micro-batching scheduler. Requests that arrive within `window` seconds of
+# the first queued one (or until `max_batch_size` is reached) are handed to
+# `handler` as a single list, and each caller gets its own result back
+# through a Future. `handler` must return one result per item, in order.
+class MicroBatcher:
+    def __init__(self, handler, window=0.02, max_batch_size=8):
+        self.handler = handler
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self.batch_sizes = {}
+
+    # Start the worker thread on first use so it is created after any fork
+    def ensure_started(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='micro-batcher', daemon=True)
+                self.thread.start()
+
+    def submit(self, item):
+        future = Future()
+        self.ensure_started()
+        self.queue.put((item, future, metrics.profile_collector.get()))
+        return future
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self.process(batch)
+
+    def process(self, batch):
+        with self.lock:
+            self.batches += 1
+            self.items += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+            self.batch_sizes[len(batch)] = self.batch_sizes.get(len(batch), 0) + 1
+
+        # Profile the batch for any ?profile=1 request that contributed to it
+        collectors = list({id(collector): collector for _, _, collector in batch if collector is not None}.values())
+        try:
+            with metrics.profile_into(collectors):
+                results = self.handler([item for item, _, _ in batch])
+        except Exception as error:
+            for _, future, _ in batch:
+                future.set_exception(error)
+            return
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "queue_depth": self.queue.qsize(),
+                "batches": self.batches,
+                "items": self.items,
+                "average_batch_size": self.items / self.batches if self.batches else 0,
+                "largest_batch": self.largest_batch,
+                "batch_sizes": dict(sorted(self.batch_sizes.items())),
+            }
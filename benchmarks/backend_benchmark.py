@@ -0,0 +1,94 @@
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+# Compare latency and resident memory of the inference backends. Each
+# backend runs in its own interpreter so memory figures do not overlap.
+# Run from the repository root:
+#   python -m benchmarks.backend_benchmark --backends torch int8 onnx
+
+# Function to read this process's resident and peak memory in MB
+def memory_mb():
+    current = peak = 0.0
+    try:
+        with open('/proc/self/status') as file:
+            for line in file:
+                if line.startswith('VmRSS:'):
+                    current = int(line.split()[1]) / 1024
+                elif line.startswith('VmHWM:'):
+                    peak = int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return current, peak
+
+def measure(backend, articles, repeats):
+    import models
+    from article_store import ArticleStore
+    from corpus import CorpusStore
+
+    sample = ArticleStore('./Templates/articles_dataset.csv').snapshot[1][:articles]
+    documents = CorpusStore(['./Templates/retrieval_corpus.jsonl']).texts
+
+    start = time.perf_counter()
+    generator = models.load_question_generator(backend)
+    embedder = models.load_embedding_model(backend)
+    load_seconds = time.perf_counter() - start
+
+    def timed(function):
+        function()  # warm-up
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            function()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
+
+    generate_ms = statistics.median(
+        timed(lambda: generator(
+            f"generate questions: {article}", max_length=64, num_return_sequences=5, num_beams=5
+        ))
+        for article in sample
+    )
+    query_ms = timed(lambda: embedder.encode([sample[0]], normalize_embeddings=True))
+    corpus_ms = timed(lambda: embedder.encode(documents, normalize_embeddings=True))
+    rss, peak = memory_mb()
+    return {
+        "backend": backend,
+        "load_s": load_seconds,
+        "generate_ms": generate_ms,
+        "encode_query_ms": query_ms,
+        "encode_corpus_ms": corpus_ms,
+        "rss_mb": rss,
+        "peak_rss_mb": peak,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the inference backends.')
+    parser.add_argument('--backends', nargs='+', default=['torch', 'int8', 'onnx'])
+    parser.add_argument('--articles', type=int, default=5)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.articles, args.repeats)))
+        return
+
+    print(f"{'backend':<8}{'load s':>8}{'generate ms':>13}{'query ms':>10}{'corpus ms':>11}{'RSS MB':>9}{'peak MB':>9}")
+    for backend in args.backends:
+        output = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.backend_benchmark', '--child', backend,
+             '--articles', str(args.articles), '--repeats', str(args.repeats)],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{backend:<8}{result['load_s']:>8.1f}{result['generate_ms']:>13.1f}"
+              f"{result['encode_query_ms']:>10.1f}{result['encode_corpus_ms']:>11.1f}"
+              f"{result['rss_mb']:>9.0f}{result['peak_rss_mb']:>9.0f}")
+
+if __name__ == '__main__':
+    main()
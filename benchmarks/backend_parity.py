@@ -0,0 +1,77 @@
+import argparse
+import sys
+import numpy as np
+import models
+from article_store import ArticleStore
+from corpus import CorpusStore
+
+# Parity check for the quantized / ONNX inference backends against the
+# full-precision torch models: generated questions must stay semantically
+# close and cosine scores must stay within tolerance. Exits non-zero on
+# failure. Run from the repository root:
+#   python -m benchmarks.backend_parity --backends int8 onnx
+
+def generate(generator, article, num_questions=5):
+    outputs = generator(
+        f"generate questions: {article}",
+        max_length=64,
+        num_return_sequences=num_questions,
+        num_beams=num_questions,
+        truncation=True
+    )
+    return [output['generated_text'] for output in outputs]
+
+def encode(model, texts):
+    return np.asarray(model.encode(texts, convert_to_numpy=True, normalize_embeddings=True), dtype=np.float32)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare inference backends with the torch reference.')
+    parser.add_argument('--backends', nargs='+', default=['int8', 'onnx'], choices=models.inference_backends[1:])
+    parser.add_argument('--articles', type=int, default=10)
+    parser.add_argument('--documents', type=int, default=100)
+    parser.add_argument('--question-tolerance', type=float, default=0.85,
+                        help='minimum mean similarity between reference and backend questions')
+    parser.add_argument('--score-tolerance', type=float, default=0.05,
+                        help='maximum absolute difference between cosine scores')
+    args = parser.parse_args()
+
+    articles = ArticleStore('./Templates/articles_dataset.csv').snapshot[1][:args.articles]
+    documents = CorpusStore(['./Templates/retrieval_corpus.jsonl']).texts[:args.documents]
+
+    reference_generator = models.load_question_generator('torch')
+    reference_embedder = models.load_embedding_model('torch')
+    reference_questions = [generate(reference_generator, article) for article in articles]
+    queries = [question_set[0] for question_set in reference_questions]
+    reference_scores = encode(reference_embedder, queries) @ encode(reference_embedder, documents).T
+
+    failed = False
+    for backend in args.backends:
+        generator = models.load_question_generator(backend)
+        embedder = models.load_embedding_model(backend)
+
+        # Question parity: each reference question against its closest backend question
+        similarities = []
+        exact = 0
+        for article, expected in zip(articles, reference_questions):
+            produced = generate(generator, article)
+            exact += sum(question in produced for question in expected)
+            matrix = encode(reference_embedder, expected) @ encode(reference_embedder, produced).T
+            similarities.extend(matrix.max(axis=1))
+        question_similarity = float(np.mean(similarities))
+
+        # Score parity: cosine scores of the same queries against the same documents
+        scores = encode(embedder, queries) @ encode(embedder, documents).T
+        score_error = float(np.abs(scores - reference_scores).max())
+        top1 = float(np.mean(scores.argmax(axis=1) == reference_scores.argmax(axis=1)))
+
+        passed = question_similarity >= args.question_tolerance and score_error <= args.score_tolerance
+        failed = failed or not passed
+        print(f"{backend}: questions identical={exact}/{len(similarities)} "
+              f"mean similarity={question_similarity:.3f}; "
+              f"max score error={score_error:.4f}; top-1 agreement={top1:.2f} "
+              f"-> {'OK' if passed else 'FAIL'}")
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
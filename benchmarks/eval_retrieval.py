@@ -0,0 +1,109 @@
+import argparse
+import os
+import random
+import re
+import statistics
+import tempfile
+import time
+import numpy as np
+from bm25 import BM25Index
+from corpus import CorpusStore
+from corpus_index import CorpusIndex
+
+# Offline retrieval evaluation on answers_dataset.csv. Every answer is a
+# document; each query is a T5-generated question about one answer, and the
+# answer it came from is the relevant document. Dense, BM25 and hybrid
+# retrieval are compared on recall@k, MRR@10 and per-query latency.
+# --queries perturbed builds queries from the answer's own words instead;
+# lexical retrieval wins those by construction, so use them only to measure
+# latency (e.g. with --distractors), never to compare ranking quality.
+# Run from the repository root: python -m benchmarks.eval_retrieval
+
+answers_file = './Templates/answers_dataset.csv'
+
+# Function to make a query from a document by dropping and shuffling words
+def perturb(text, rng, keep=0.6):
+    words = re.findall(r'\w+', text.lower())
+    kept = [word for word in words if rng.random() < keep] or words[:3]
+    rng.shuffle(kept)
+    return " ".join(kept) + "?"
+
+def make_queries(documents, mode, rng):
+    if mode == 'perturbed':
+        return [perturb(document, rng) for document in documents]
+    import models
+    generator = models.load_question_generator(models.inference_backend)
+    outputs = generator(
+        [f"generate questions: {document}" for document in documents],
+        max_length=64, num_beams=1, batch_size=16, truncation=True
+    )
+    return [(output[0] if isinstance(output, list) else output)['generated_text'] for output in outputs]
+
+def evaluate(name, rank, queries, relevant, top_k=10):
+    recall_1 = recall_3 = reciprocal = 0.0
+    latencies = []
+    for query, embedding, target in zip(queries, *relevant):
+        start = time.perf_counter()
+        indices = list(rank(query, embedding, top_k))
+        latencies.append((time.perf_counter() - start) * 1000)
+        if target in indices:
+            position = indices.index(target)
+            recall_1 += position < 1
+            recall_3 += position < 3
+            reciprocal += 1 / (position + 1)
+    count = len(queries)
+    print(f"{name:<22}{recall_1 / count:>8.3f}{recall_3 / count:>8.3f}{reciprocal / count:>8.3f}"
+          f"{statistics.median(latencies):>10.3f}{np.percentile(latencies, 99):>10.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Evaluate dense, BM25 and hybrid retrieval.')
+    parser.add_argument('--queries', choices=['generated', 'perturbed'], default='generated',
+                        help='perturbed queries copy the target words: latency only')
+    parser.add_argument('--weights', type=float, nargs='+', default=[0.5, 0.7, 0.9],
+                        help='dense weights to try for hybrid fusion')
+    parser.add_argument('--candidates', type=int, default=200)
+    parser.add_argument('--distractors', type=int, default=0,
+                        help='extra synthetic documents added to the corpus')
+    parser.add_argument('--stand-in', action='store_true', help='use the hashed stand-in embedder')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        sources = [answers_file]
+        if args.distractors:
+            from benchmarks.load_benchmark import write_synthetic_corpus
+            sources.append(os.path.join(directory, 'distractors.jsonl'))
+            write_synthetic_corpus(sources[-1], args.distractors, args.seed)
+        corpus = CorpusStore(sources).snapshot
+        answers = CorpusStore([answers_file]).snapshot
+        targets = [corpus.positions[doc_id] for doc_id in answers.ids]
+
+        if args.stand_in:
+            from benchmarks.load_benchmark import StandInEmbedder
+            embedder = StandInEmbedder()
+        else:
+            import models
+            embedder = models.load_embedding_model(models.inference_backend)
+
+        index = CorpusIndex(embedder, 'eval', path=os.path.join(directory, 'index'))
+        index.build(corpus.texts, corpus.ids)
+        lexical = BM25Index(corpus.texts)
+
+        queries = make_queries(answers.texts, args.queries, rng)
+        embeddings = index.encode(queries)
+        relevant = (embeddings, targets)
+
+        print(f"{len(corpus)} documents, {len(queries)} {args.queries} queries")
+        if args.queries == 'perturbed':
+            print("perturbed queries reuse the target's words: recall and MRR favour BM25")
+        print(f"{'mode':<22}{'R@1':>8}{'R@3':>8}{'MRR@10':>8}{'p50 ms':>10}{'p99 ms':>10}")
+        evaluate('dense', lambda q, e, k: index.rank(e, k)[0], queries, relevant)
+        evaluate('bm25', lambda q, e, k: lexical.search(q, k)[0], queries, relevant)
+        for weight in args.weights:
+            index.hybrid = {'candidates': args.candidates, 'dense_weight': weight}
+            index.lexical = lexical
+            evaluate(f'hybrid w={weight}', lambda q, e, k: index.rank(e, k, q)[0], queries, relevant)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+# Reproducible load benchmark for app.py. Each corpus size runs in a fresh
+# interpreter with its own temporary ratings database, corpus and index;
+# requests go through the Flask test client from a pool of threads. By
+# default small stand-in models replace T5 and MiniLM so the run is offline
+# and finishes in seconds; --real-models uses the configured models.
+#
+#   python -m benchmarks.load_benchmark -o bench.json
+#   python -m benchmarks.load_benchmark -o new.json --baseline bench.json
+
+routes = ('/random', '/run_script1', '/run_script2', '/submit_rating', '/rate_us')
+
+# Stand-in for the sentence embedding model: hashed bag of words, normalized
+class StandInEmbedder:
+    dim = 384
+
+    def encode(self, texts, convert_to_numpy=True, normalize_embeddings=True, **kwargs):
+        single = isinstance(texts, str)
+        texts = [texts] if single else texts
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r'\w+', text.lower()):
+                vectors[row, int(hashlib.md5(word.encode()).hexdigest()[:8], 16) % self.dim] += 1
+        if normalize_embeddings:
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return vectors[0] if single else vectors
+
+# Stand-in for the T5 pipeline: fixed cost per batch plus per input
+class StandInGenerator:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def __call__(self, inputs, num_return_sequences=1, **kwargs):
+        time.sleep(self.latency * (1 + 0.1 * len(inputs)))
+        outputs = []
+        for text in inputs:
+            words = re.findall(r'\w+', text)[2:]
+            outputs.append([
+                {"generated_text": f"What does the article say about {' '.join(words[i:i + 3])}?"}
+                for i in range(num_return_sequences)
+            ])
+        return outputs
+
+# Function to write a synthetic corpus of `size` documents built by
+# recombining sentences from articles_dataset.csv
+def write_synthetic_corpus(path, size, seed=0):
+    from article_store import ArticleStore
+    sentences = ArticleStore('./Templates/articles_dataset.csv').snapshot[1]
+    rng = random.Random(seed)
+    with open(path, 'w', encoding='utf-8') as file:
+        for i in range(size):
+            text = " ".join(rng.sample(sentences, 2)) + f" (document {i})"
+            file.write(json.dumps({"text": text}) + "\n")
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def run_level(app, route, concurrency, count, articles, rng):
+    def one_request(i):
+        client = app.test_client()
+        article = f"{rng.choice(articles)} Variant {i}."
+        start = time.perf_counter()
+        if route == '/run_script1':
+            response = client.post(route, data={'article': article})
+        elif route == '/run_script2':
+            response = client.get(route, query_string={'question': f"What about {article}?"})
+        elif route == '/submit_rating':
+            response = client.post(route, data={'rating': str(1 + i % 5)})
+        else:
+            response = client.get(route)
+        return (time.perf_counter() - start) * 1000, response.status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one_request, range(count)))
+    elapsed = time.perf_counter() - start
+    latencies = [latency for latency, _ in results]
+    return {
+        "route": route,
+        "concurrency": concurrency,
+        "requests": count,
+        "errors": sum(status >= 400 for _, status in results),
+        "throughput_rps": count / elapsed,
+        "p50_ms": percentile(latencies, 0.5),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "mean_ms": statistics.mean(latencies),
+    }
+
+# Runs inside the child interpreter for one corpus size
+def run_corpus_size(args):
+    import models
+    if not args.real_models:
+        models.embedding_model.instance = StandInEmbedder()
+        models.question_generator.instance = StandInGenerator(args.model_latency_ms / 1000)
+
+    import app
+    import pipeline
+    if not args.real_models:
+        # Avoid needing the punkt data for nltk in offline runs
+        split = lambda article: re.split(r'(?<=[.!?])\s+', article.strip())
+        app.split_sentences = pipeline.split_sentences = split
+
+    rng = random.Random(args.seed)
+    articles = app.article_store.snapshot[1]
+    app.corpus_index.get()  # build the index before timing requests
+
+    results = []
+    for route in args.routes:
+        for concurrency in args.concurrency:
+            result = run_level(app.app, route, concurrency, args.requests, articles, rng)
+            result["corpus_size"] = args.child
+            results.append(result)
+    return results
+
+# Function to compare results with a baseline; returns a list of regressions
+def compare(results, baseline, tolerance):
+    previous = {(r["route"], r["concurrency"], r["corpus_size"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get((result["route"], result["concurrency"], result["corpus_size"]))
+        if before is None:
+            continue
+        label = f"{result['route']} c={result['concurrency']} corpus={result['corpus_size']}"
+        if result["throughput_rps"] < before["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{label}: throughput {before['throughput_rps']:.1f} -> {result['throughput_rps']:.1f} rps")
+        if result["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{label}: p95 {before['p95_ms']:.2f} -> {result['p95_ms']:.2f} ms")
+        if result["errors"] > before["errors"]:
+            regressions.append(f"{label}: errors {before['errors']} -> {result['errors']}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Load benchmark for the Flask routes.')
+    parser.add_argument('-o', '--output', default='bench_results.json')
+    parser.add_argument('--baseline', help='previous results JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative regression')
+    parser.add_argument('--routes', nargs='+', default=list(routes))
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--corpus-sizes', type=int, nargs='+', default=[300, 3000, 30000])
+    parser.add_argument('--requests', type=int, default=100, help='requests per route and level')
+    parser.add_argument('--model-latency-ms', type=float, default=5.0, help='stand-in generator cost')
+    parser.add_argument('--real-models', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--child', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_corpus_size(args)))
+        return
+
+    results = []
+    passthrough = [
+        '--routes', *args.routes,
+        '--concurrency', *map(str, args.concurrency),
+        '--requests', str(args.requests),
+        '--model-latency-ms', str(args.model_latency_ms),
+        '--seed', str(args.seed),
+    ] + (['--real-models'] if args.real_models else [])
+    for size in args.corpus_sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            corpus_path = os.path.join(directory, 'corpus.jsonl')
+            write_synthetic_corpus(corpus_path, size, args.seed)
+            env = dict(
+                os.environ,
+                CORPUS_SOURCES=corpus_path,
+                RATINGS_DB=os.path.join(directory, 'ratings.db'),
+                CORPUS_INDEX_DIR=os.path.join(directory, 'index'),
+                CACHE_MAX_ENTRIES='0',
+                WARM_UP='0',
+            )
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.load_benchmark', '--child', str(size), *passthrough],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout
+        results.extend(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{'route':<15}{'corpus':>8}{'conc':>6}{'rps':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}")
+    for r in results:
+        print(f"{r['route']:<15}{r['corpus_size']:>8}{r['concurrency']:>6}{r['throughput_rps']:>10.1f}"
+              f"{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}{r['errors']:>8}")
+
+    report = {
+        "created": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "python": sys.version.split()[0],
+        "stand_in_models": not args.real_models,
+        "settings": {key: value for key, value in vars(args).items() if key not in ('child', 'output', 'baseline')},
+        "results": results,
+    }
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from ratings_store import RatingsStore
+
+# Multi-process stress test for the ratings store: several processes submit
+# ratings (and read totals) at the same time, with frequent compaction, and
+# the final totals must account for every submission.
+# Run from the repository root: python -m benchmarks.ratings_stress
+
+def submit_ratings(db_path, count, compact_every, seed):
+    store = RatingsStore(db_path, compact_every=compact_every)
+    rng = random.Random(seed)
+    submitted = 0
+    for i in range(count):
+        rating = rng.randint(1, 5)
+        store.add(rating)
+        submitted += rating
+        if i % 10 == 0:
+            store.totals()
+    return submitted
+
+def main():
+    parser = argparse.ArgumentParser(description='Stress the ratings store from many processes.')
+    parser.add_argument('--processes', type=int, default=8)
+    parser.add_argument('--ratings', type=int, default=500, help='ratings per process')
+    parser.add_argument('--compact-every', type=int, default=97)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, 'ratings.db')
+        RatingsStore(db_path)
+
+        start = time.perf_counter()
+        with multiprocessing.Pool(args.processes) as pool:
+            submitted = pool.starmap(
+                submit_ratings,
+                [(db_path, args.ratings, args.compact_every, seed) for seed in range(args.processes)]
+            )
+        elapsed = time.perf_counter() - start
+
+        totals = RatingsStore(db_path).totals()
+        expected_count = args.processes * args.ratings
+        print(f"{expected_count} ratings from {args.processes} processes in {elapsed:.2f}s "
+              f"({expected_count / elapsed:.0f} writes/s)")
+        print(f"expected: count={expected_count} total={sum(submitted)}")
+        print(f"stored:   count={totals['ratings_count']} total={totals['total_ratings']}")
+        if totals['ratings_count'] != expected_count or totals['total_ratings'] != sum(submitted):
+            print("FAIL: ratings were lost")
+            sys.exit(1)
+        print("OK: no lost updates")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+import argparse
+import time
+import numpy as np
+from search_backends import ExactSearch, IVFSearch
+
+# Benchmark the approximate IVF search against the exact path.
+# Run from the repository root: python -m benchmarks.search_benchmark
+
+# Function to build a clustered, normalized synthetic corpus
+def synthetic_embeddings(count, dim, clusters, rng):
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, count)
+    vectors = centers[labels] + 0.5 * rng.standard_normal((count, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+def time_queries(search, queries, top_k):
+    latencies = []
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        indices, _ = search(query, top_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(indices)
+    return results, np.percentile(latencies, 50), np.percentile(latencies, 99)
+
+def recall_at_k(results, truth):
+    hits = sum(len(set(r) & set(t)) for r, t in zip(results, truth))
+    return hits / sum(len(t) for t in truth)
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare exact and IVF retrieval.')
+    parser.add_argument('--docs', type=int, default=200000)
+    parser.add_argument('--dim', type=int, default=384)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--top-k', type=int, default=3)
+    parser.add_argument('--nlist', type=int, default=None)
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[1, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    embeddings = synthetic_embeddings(args.docs, args.dim, max(1, args.docs // 500), rng)
+    queries = synthetic_embeddings(args.queries, args.dim, max(1, args.docs // 500), rng)
+
+    exact = ExactSearch(embeddings)
+    truth, p50, p99 = time_queries(lambda q, k: exact.search(q, k), queries, args.top_k)
+    print(f"docs={args.docs} dim={args.dim} top_k={args.top_k}")
+    print(f"{'exact':>12}  recall@{args.top_k}=1.000  p50={p50:.3f}ms  p99={p99:.3f}ms")
+
+    start = time.perf_counter()
+    ivf = IVFSearch(embeddings, nlist=args.nlist)
+    print(f"ivf build: nlist={ivf.nlist} in {time.perf_counter() - start:.1f}s")
+    for nprobe in args.nprobe:
+        results, p50, p99 = time_queries(
+            lambda q, k: ivf.search(q, k, nprobe=nprobe), queries, args.top_k
+        )
+        recall = recall_at_k(results, truth)
+        print(f"{'ivf/' + str(nprobe):>12}  recall@{args.top_k}={recall:.3f}  p50={p50:.3f}ms  p99={p99:.3f}ms")
+
+if __name__ == '__main__':
+    main()
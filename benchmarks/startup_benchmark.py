@@ -0,0 +1,56 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Measure worker start-up: time to import app.py and serve the first static
+# page, in a fresh interpreter each run.
+# Run from the repository root: python -m benchmarks.startup_benchmark
+
+probe = """
+import time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get('/manual')
+served = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(imported - start, served - start)
+"""
+
+ready_probe = """
+import time
+start = time.perf_counter()
+import app
+app.models.warm_up(background=False)
+print(time.perf_counter() - start)
+"""
+
+# Function to run a probe in a fresh interpreter and parse the timings it
+# prints; the ratings database goes to a temporary directory
+def run(code):
+    with tempfile.TemporaryDirectory() as directory:
+        output = subprocess.run(
+            [sys.executable, '-c', code], capture_output=True, text=True, check=True,
+            env=dict(os.environ, RATINGS_DB=os.path.join(directory, 'ratings.db'))
+        ).stdout
+    return [float(value) for value in output.splitlines()[-1].split()]
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure app.py start-up time.')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--with-models', action='store_true',
+                        help='also measure time until every model is loaded')
+    args = parser.parse_args()
+
+    timings = [run(probe) for _ in range(args.runs)]
+    print(f"import app:         median {statistics.median(t[0] for t in timings) * 1000:.1f}ms")
+    print(f"first /manual page: median {statistics.median(t[1] for t in timings) * 1000:.1f}ms")
+    if args.with_models:
+        ready = [run(ready_probe)[0] for _ in range(args.runs)]
+        print(f"all models loaded:  median {statistics.median(ready):.2f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+import math
+import numpy as np
+
+# Function to split text into lowercase word tokens with nltk
+def tokenize(text):
+    from nltk.tokenize import wordpunct_tokenize
+    return [token.lower() for token in wordpunct_tokenize(text) if token.isalnum()]
+
+# In-memory BM25 inverted index. Each term maps to the documents containing
+# it and a precomputed BM25 weight per document, so a query only touches the
+# postings of its own terms rather than every document. To keep that cost
+# flat as the corpus grows, terms found in more than `max_df` of the
+# documents ("the", "of", ...) are not indexed, and each term keeps only its
+# `max_postings` highest-weighted documents.
+class BM25Index:
+    def __init__(self, documents, k1=1.5, b=0.75, max_df=0.5, max_postings=1000):
+        tokenized = [tokenize(document) for document in documents]
+        lengths = np.array([len(tokens) for tokens in tokenized], dtype=np.float32)
+        average_length = float(lengths.mean()) if len(lengths) else 0.0
+        self.size = len(tokenized)
+
+        counts = {}
+        for doc_id, tokens in enumerate(tokenized):
+            for token in tokens:
+                postings = counts.setdefault(token, {})
+                postings[doc_id] = postings.get(doc_id, 0) + 1
+
+        self.postings = {}
+        for term, postings in counts.items():
+            if len(postings) > max(max_df * self.size, 1):
+                continue
+            doc_ids = np.fromiter(postings.keys(), dtype=np.int64, count=len(postings))
+            frequencies = np.fromiter(postings.values(), dtype=np.float32, count=len(postings))
+            idf = math.log(1 + (self.size - len(postings) + 0.5) / (len(postings) + 0.5))
+            norms = k1 * (1 - b + b * lengths[doc_ids] / max(average_length, 1e-9))
+            weights = (idf * frequencies * (k1 + 1) / (frequencies + norms)).astype(np.float32)
+            if len(weights) > max_postings:
+                keep = np.argpartition(-weights, max_postings - 1)[:max_postings]
+                doc_ids, weights = doc_ids[keep], weights[keep]
+            self.postings[term] = (doc_ids, weights)
+
+    # Return (document indices, scores) for the best `top_k` matches
+    def search(self, query, top_k=200):
+        matched = [self.postings[term] for term in set(tokenize(query)) if term in self.postings]
+        if not matched:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        doc_ids = np.concatenate([ids for ids, _ in matched])
+        weights = np.concatenate([w for _, w in matched])
+        candidates, positions = np.unique(doc_ids, return_inverse=True)
+        scores = np.bincount(positions, weights=weights).astype(np.float32)
+        if len(scores) > top_k:
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+            candidates, scores = candidates[best], scores[best]
+        order = np.argsort(-scores)
+        return candidates[order], scores[order]
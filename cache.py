@@ -0,0 +1,131 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing, contextmanager
+
+# Function to normalize text before it becomes part of a cache key
+def normalize_text(text):
+    return re.sub(r'\s+', ' ', text or '').strip()
+
+# Function to build a content-addressed key from JSON-serializable parts
+def make_key(*parts):
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+# Bounded in-memory LRU cache with an optional TTL and an optional SQLite
+# tier on disk that survives restarts and is shared between workers.
+# Values must be JSON-serializable to be written to the disk tier. Every
+# `prune_every` writes, expired rows and all but the `disk_max_entries`
+# most recently written rows are deleted from the disk tier.
+class ResultCache:
+    def __init__(self, max_entries=1024, ttl=None, disk_path=None, disk_max_entries=100000, prune_every=100):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_path = disk_path
+        self.disk_max_entries = disk_max_entries
+        self.prune_every = prune_every
+        self.writes = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if disk_path:
+            with self.connect() as connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT, expires REAL)"
+                )
+
+    @contextmanager
+    def connect(self):
+        with closing(sqlite3.connect(self.disk_path, timeout=5)) as connection:
+            with connection:
+                yield connection
+
+    def expiry(self):
+        return time.time() + self.ttl if self.ttl else None
+
+    def get(self, key):
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > now:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.entries[key]
+
+        if self.disk_path:
+            with self.connect() as connection:
+                row = connection.execute(
+                    "SELECT value, expires FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+            if row is not None and (row[1] is None or row[1] > now):
+                value = json.loads(row[0])
+                self.remember(key, value, row[1])
+                with self.lock:
+                    self.disk_hits += 1
+                return value
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def remember(self, key, value, expires):
+        with self.lock:
+            self.entries[key] = (value, expires)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def set(self, key, value):
+        expires = self.expiry()
+        self.remember(key, value, expires)
+        if self.disk_path:
+            with self.connect() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires)
+                )
+            with self.lock:
+                self.writes += 1
+                due = self.writes % self.prune_every == 0
+            if due:
+                self.prune()
+
+    # Delete expired rows and the oldest rows beyond disk_max_entries
+    def prune(self):
+        with self.connect() as connection:
+            connection.execute("DELETE FROM cache WHERE expires IS NOT NULL AND expires <= ?", (time.time(),))
+            connection.execute(
+                "DELETE FROM cache WHERE rowid IN "
+                "(SELECT rowid FROM cache ORDER BY rowid DESC LIMIT -1 OFFSET ?)",
+                (self.disk_max_entries,)
+            )
+
+    # Return the cached value for key, computing and storing it on a miss
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value)
+        return value
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,133 @@
+import csv
+import hashlib
+import json
+import os
+import threading
+import time
+
+# Column names tried, in order, when reading a CSV corpus file
+text_columns = ('text', 'Article', 'Answer')
+
+# Function to clean one corpus entry, including rows of answers_dataset.csv
+# that still carry the quotes and trailing commas of a Python list literal
+def clean_text(text):
+    text = (text or '').strip().rstrip(',').strip()
+    if len(text) > 1 and text[0] == text[-1] == '"':
+        text = text[1:-1]
+    return ' '.join(text.split())
+
+# Function to derive a stable document ID from the document's content
+def document_id(text):
+    return hashlib.sha1(text.lower().encode('utf-8')).hexdigest()[:12]
+
+# Function to yield (id or None, text) pairs from a .jsonl or .csv source
+def read_source(path):
+    if path.endswith('.jsonl'):
+        with open(path, encoding='utf-8') as file:
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+                    yield record.get('id'), record.get('text', '')
+        return
+
+    try:
+        with open(path, newline='', encoding='utf-8') as file:
+            rows = list(csv.DictReader(file))
+    except UnicodeDecodeError:
+        with open(path, newline='', encoding='cp1252') as file:
+            rows = list(csv.DictReader(file))
+    for row in rows:
+        column = next((c for c in text_columns if c in row), next(iter(row), None))
+        yield None, row.get(column, '')
+
+# Immutable view of the corpus at one point in time
+class CorpusSnapshot:
+    def __init__(self, ids, texts, mtimes):
+        self.ids = ids
+        self.texts = texts
+        self.mtimes = mtimes
+        self.positions = {doc_id: i for i, doc_id in enumerate(ids)}
+
+    def get(self, doc_id):
+        position = self.positions.get(doc_id)
+        return self.texts[position] if position is not None else None
+
+    def __len__(self):
+        return len(self.texts)
+
+# Retrieval corpus loaded from one or more CSV/JSONL files into a
+# deduplicated list with stable IDs. Source mtimes are checked at most once
+# per `check_interval` seconds; when one changes, the corpus is reloaded in
+# a background thread and `on_reload(snapshot)` runs before the new snapshot
+# replaces the old one, so requests keep being served throughout.
+class CorpusStore:
+    def __init__(self, sources, check_interval=5.0, on_reload=None):
+        self.sources = list(sources)
+        self.check_interval = check_interval
+        self.on_reload = on_reload
+        self.lock = threading.Lock()
+        self.checked_at = time.monotonic()
+        self.reloading = False
+        self.snapshot = self.read()
+
+    def source_mtimes(self):
+        return {path: os.stat(path).st_mtime for path in self.sources if os.path.exists(path)}
+
+    # Read every source; a missing source or an empty corpus raises
+    # ValueError, so a mistyped CORPUS_SOURCES fails at start-up and a reload
+    # keeps the previous corpus
+    def read(self):
+        missing = [path for path in self.sources if not os.path.exists(path)]
+        if missing:
+            raise ValueError(f"Corpus source not found: {', '.join(missing)}")
+        mtimes = self.source_mtimes()
+        ids = []
+        texts = []
+        seen = set()
+        for path in mtimes:
+            for explicit_id, text in read_source(path):
+                text = clean_text(text)
+                key = text.lower()
+                if not text or key in seen:
+                    continue
+                seen.add(key)
+                ids.append(str(explicit_id) if explicit_id is not None else document_id(text))
+                texts.append(text)
+        if not texts:
+            raise ValueError(f"Corpus sources contain no documents: {', '.join(self.sources)}")
+        return CorpusSnapshot(ids, texts, mtimes)
+
+    @property
+    def texts(self):
+        return self.snapshot.texts
+
+    def reload(self):
+        snapshot = self.read()
+        if self.on_reload is not None:
+            self.on_reload(snapshot)
+        self.snapshot = snapshot
+        return snapshot
+
+    # Start a background reload if any source file changed since the last load
+    def refresh(self):
+        now = time.monotonic()
+        if now - self.checked_at < self.check_interval:
+            return False
+        with self.lock:
+            if self.reloading or now - self.checked_at < self.check_interval:
+                return False
+            self.checked_at = now
+            if self.source_mtimes() == self.snapshot.mtimes:
+                return False
+            self.reloading = True
+        threading.Thread(target=self.reload_in_background, name='corpus-reload', daemon=True).start()
+        return True
+
+    def reload_in_background(self):
+        try:
+            self.reload()
+        except Exception as error:
+            print(f"Corpus reload failed, keeping the previous corpus: {error}")
+        finally:
+            with self.lock:
+                self.reloading = False
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import time
+import numpy as np
+from search_backends import build_search_backend, top_k_indices
+from bm25 import BM25Index
+
+# Directory holding the persisted corpus embeddings
+index_dir = os.environ.get('CORPUS_INDEX_DIR', './models/corpus_index')
+
+# Function to hash a document's text for the manifest
+def hash_text(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+# Precomputed, normalized embedding matrix for the retrieval corpus.
+# The matrix is stored as a .npy file (memory-mapped on load) named after
+# its content version, and a manifest records the model name, the matrix
+# file and one content hash per document, so only documents whose text
+# changed are re-encoded on the next build. Matrix files are never
+# rewritten; replacing the manifest is the single step that publishes a new
+# index, so a reader always sees hashes and rows from the same build.
+# With `hybrid` options ({'candidates': 200, 'dense_weight': 0.7}) a BM25
+# index is built as well, and queries given with their text are answered by
+# re-ranking the lexical candidates with cosine similarity.
+class CorpusIndex:
+    def __init__(self, embedding_model, model_name, path=index_dir, backend='exact', hybrid=None, **backend_options):
+        self.embedding_model = embedding_model
+        self.model_name = model_name
+        self.path = path
+        self.backend_name = backend
+        self.backend_options = backend_options
+        self.backend = None
+        self.hybrid = hybrid
+        self.lexical = None
+        self.manifest_file = os.path.join(path, 'manifest.json')
+        self.documents = []
+        self.ids = []
+        self.embeddings = None
+        self.version = None
+
+    # Encode a list of texts into unit-length float32 rows
+    def encode(self, texts):
+        embeddings = self.embedding_model.encode(
+            texts,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+        return np.asarray(embeddings, dtype=np.float32)
+
+    def read_manifest(self):
+        try:
+            with open(self.manifest_file, 'r') as file:
+                manifest = json.load(file)
+        except (FileNotFoundError, ValueError):
+            return None
+        if manifest.get('model') != self.model_name or 'matrix' not in manifest:
+            return None
+        if not os.path.exists(os.path.join(self.path, manifest['matrix'])):
+            return None
+        return manifest
+
+    def index_version(self, hashes):
+        return hash_text(self.model_name + ''.join(hashes))[:16]
+
+    # Load the index from disk, re-encoding only new or changed documents
+    def build(self, documents, ids=None):
+        documents = list(documents)
+        self.ids = list(ids) if ids is not None else [str(i) for i in range(len(documents))]
+        hashes = [hash_text(doc) for doc in documents]
+        if not documents:
+            self.documents, self.embeddings, self.backend, self.lexical = [], None, None, None
+            self.version = self.index_version(hashes)
+            return 0
+        manifest = self.read_manifest()
+
+        if manifest is not None and manifest['hashes'] == hashes:
+            self.load(documents, manifest)
+            return 0
+
+        cached_rows = {}
+        cached = None
+        if manifest is not None:
+            cached = np.load(os.path.join(self.path, manifest['matrix']), mmap_mode='r')
+            cached_rows = {h: i for i, h in enumerate(manifest['hashes'])}
+
+        missing = [i for i, h in enumerate(hashes) if h not in cached_rows]
+        fresh = self.encode([documents[i] for i in missing]) if missing else None
+        dim = fresh.shape[1] if fresh is not None else cached.shape[1]
+
+        matrix = np.empty((len(documents), dim), dtype=np.float32)
+        for i, h in enumerate(hashes):
+            if h in cached_rows:
+                matrix[i] = cached[cached_rows[h]]
+        if fresh is not None:
+            matrix[missing] = fresh
+        del cached
+
+        manifest = {
+            'model': self.model_name,
+            'dim': int(dim),
+            'matrix': f'embeddings-{self.index_version(hashes)}.npy',
+            'hashes': hashes,
+        }
+        self.save(matrix, manifest)
+        self.load(documents, manifest)
+        return len(missing)
+
+    # Write the versioned matrix first, then publish it by replacing the
+    # manifest; both go through temp files so readers never see a partial file
+    def save(self, matrix, manifest):
+        os.makedirs(self.path, exist_ok=True)
+        suffix = f'.{os.getpid()}.tmp'
+        matrix_file = os.path.join(self.path, manifest['matrix'])
+        with open(matrix_file + suffix, 'wb') as file:
+            np.save(file, matrix)
+        os.replace(matrix_file + suffix, matrix_file)
+        with open(self.manifest_file + suffix, 'w') as file:
+            json.dump(manifest, file)
+        os.replace(self.manifest_file + suffix, self.manifest_file)
+        self.remove_stale(manifest['matrix'])
+
+    # Delete superseded matrix files once no build can still be reading them
+    def remove_stale(self, current, grace=600):
+        cutoff = time.time() - grace
+        for name in os.listdir(self.path):
+            path = os.path.join(self.path, name)
+            if name.startswith('embeddings') and name != current:
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                except FileNotFoundError:
+                    pass  # Removed by another worker
+
+    def load(self, documents, manifest):
+        self.documents = documents
+        self.embeddings = np.load(os.path.join(self.path, manifest['matrix']), mmap_mode='r')
+        self.backend = build_search_backend(self.backend_name, self.embeddings, **self.backend_options)
+        if self.hybrid:
+            self.lexical = BM25Index(documents)
+        self.version = self.index_version(manifest['hashes'])
+
+    # Take the BM25 candidates for the query text, score them by cosine
+    # similarity and rank by a weighted sum of both (BM25 scaled to [0, 1]).
+    # Falls back to dense search when too few documents share a term.
+    def hybrid_rank(self, query_text, query_embedding, top_k):
+        candidates, lexical_scores = self.lexical.search(query_text, top_k=self.hybrid.get('candidates', 200))
+        if len(candidates) < top_k:
+            return self.backend.search(query_embedding, top_k=top_k)
+        dense_scores = np.asarray(self.embeddings[candidates]) @ query_embedding
+        dense_weight = self.hybrid.get('dense_weight', 0.7)
+        fused = dense_weight * dense_scores + (1 - dense_weight) * lexical_scores / lexical_scores.max()
+        best = top_k_indices(fused, top_k)
+        return candidates[best], fused[best]
+
+    # An index over zero documents matches nothing
+    def rank(self, query_embedding, top_k, query_text=None):
+        if self.backend is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if self.lexical is not None and query_text is not None:
+            return self.hybrid_rank(query_text, query_embedding, top_k)
+        return self.backend.search(query_embedding, top_k=top_k)
+
+    # Rank documents against an already-encoded query with the configured backend
+    def search(self, query_embedding, top_k=3, query_text=None):
+        indices, scores = self.rank(query_embedding, top_k, query_text)
+        return [(self.documents[i], float(score)) for i, score in zip(indices, scores)]
+
+    # Rank documents for several encoded queries at once; returns one list of
+    # (id, document, score) per query
+    def search_many(self, query_embeddings, top_k=3, query_texts=None):
+        if self.backend is None:
+            return [[] for _ in query_embeddings]
+        if self.lexical is not None and query_texts is not None:
+            rankings = [
+                self.hybrid_rank(text, embedding, top_k)
+                for text, embedding in zip(query_texts, query_embeddings)
+            ]
+        else:
+            rankings = self.backend.search_many(query_embeddings, top_k=top_k)
+        return [
+            [(self.ids[i], self.documents[i], float(score)) for i, score in zip(indices, scores)]
+            for indices, scores in rankings
+        ]
@@ -0,0 +1,29 @@
+import gc
+import multiprocessing
+import os
+
+# gunicorn -c gunicorn.conf.py app:app
+#
+# Two ways to keep memory flat as workers are added:
+# - INFERENCE_SOCKET set: models live in inference_server.py and workers
+#   only hold small client proxies.
+# - Otherwise: models are loaded once in the master before forking, so all
+#   workers share the same weight pages copy-on-write.
+# In both cases the corpus embeddings are memory-mapped read-only and
+# shared through the page cache.
+
+bind = os.environ.get('BIND', '127.0.0.1:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.environ.get('WEB_THREADS', 4))
+timeout = 120
+
+preload_app = True
+if not os.environ.get('INFERENCE_SOCKET'):
+    os.environ.setdefault('PRELOAD_MODELS', '1')
+    # One torch thread pool per worker would oversubscribe the cores
+    os.environ.setdefault('OMP_NUM_THREADS', str(max(1, multiprocessing.cpu_count() // workers)))
+
+# Move everything loaded so far out of the garbage collector's reach, so GC
+# passes in the workers do not touch (and so copy) the shared pages
+def when_ready(server):
+    gc.freeze()
@@ -0,0 +1,180 @@
+import argparse
+import json
+import os
+import secrets
+import stat
+import threading
+from multiprocessing.connection import Client, Listener
+
+# Shared inference process. One process loads T5 and MiniLM and serves every
+# web worker over a Unix socket, so adding workers does not add model
+# copies. Generation calls from all workers go through one micro-batcher.
+#
+#   python inference_server.py --socket /tmp/lateral-reading.sock
+#   INFERENCE_SOCKET=/tmp/lateral-reading.sock gunicorn -c gunicorn.conf.py app:app
+
+default_socket = '/tmp/lateral-reading.sock'
+
+# Connections are authenticated with INFERENCE_AUTHKEY when it is set.
+# Otherwise the server generates a random key at start-up and writes it to
+# `<socket>.key`, readable only by its user, where clients read it from.
+# Messages are unpickled, so the key must never be a known value.
+def key_file(path):
+    return path + '.key'
+
+def read_authkey(path):
+    if os.environ.get('INFERENCE_AUTHKEY'):
+        return os.environ['INFERENCE_AUTHKEY'].encode('utf-8')
+    with open(key_file(path), 'rb') as file:
+        return file.read()
+
+def create_authkey(path):
+    if os.environ.get('INFERENCE_AUTHKEY'):
+        return os.environ['INFERENCE_AUTHKEY'].encode('utf-8')
+    authkey = secrets.token_hex(32).encode('utf-8')
+    descriptor = os.open(key_file(path) + '.tmp', os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(descriptor, 'wb') as file:
+        file.write(authkey)
+    os.replace(key_file(path) + '.tmp', key_file(path))
+    return authkey
+
+# Client side: one connection per thread, reopened once if the server restarted
+class InferenceClient:
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+
+    def connection(self):
+        if getattr(self.local, 'connection', None) is None:
+            # Read the key on every connect, as a restarted server has a new one
+            self.local.connection = Client(self.path, family='AF_UNIX', authkey=read_authkey(self.path))
+        return self.local.connection
+
+    def call(self, operation, *args, **kwargs):
+        for attempt in range(2):
+            try:
+                connection = self.connection()
+                connection.send((operation, args, kwargs))
+                status, result = connection.recv()
+                break
+            except (EOFError, OSError):
+                self.local.connection = None
+                if attempt:
+                    raise
+        if status == 'error':
+            raise RuntimeError(f"Inference server error: {result}")
+        return result
+
+# Stand-in for the text2text-generation pipeline in a web worker
+class RemoteGenerator:
+    def __init__(self, client, tokenizer_path):
+        self.client = client
+        self.tokenizer_path = tokenizer_path
+        self.local_tokenizer = None
+
+    def __call__(self, inputs, **kwargs):
+        return self.client.call('generate', inputs, **kwargs)
+
+    # The tokenizer is small, so it is loaded locally for token counting
+    @property
+    def tokenizer(self):
+        if self.local_tokenizer is None:
+            from transformers import AutoTokenizer
+            self.local_tokenizer = AutoTokenizer.from_pretrained(self.tokenizer_path)
+        return self.local_tokenizer
+
+# Stand-in for the SentenceTransformer in a web worker
+class RemoteEmbedder:
+    def __init__(self, client):
+        self.client = client
+
+    def encode(self, texts, **kwargs):
+        return self.client.call('encode', texts, **kwargs)
+
+# Server side: run pipeline calls from many connections as padded batches.
+# Each item is (inputs, kwargs); calls with identical kwargs are merged.
+def run_generation_batch(generator, requests):
+    results = [None] * len(requests)
+    groups = {}
+    for i, (inputs, kwargs) in enumerate(requests):
+        kwargs = {key: value for key, value in kwargs.items() if key != 'batch_size'}
+        groups.setdefault(json.dumps(kwargs, sort_keys=True), []).append(i)
+    for key, indices in groups.items():
+        kwargs = json.loads(key)
+        flat = []
+        for i in indices:
+            inputs = requests[i][0]
+            flat.extend([inputs] if isinstance(inputs, str) else inputs)
+        outputs = generator(flat, batch_size=len(flat), **kwargs)
+        outputs = [[output] if isinstance(output, dict) else output for output in outputs]
+        position = 0
+        for i in indices:
+            inputs = requests[i][0]
+            if isinstance(inputs, str):
+                results[i] = outputs[position]
+                position += 1
+            else:
+                results[i] = outputs[position:position + len(inputs)]
+                position += len(inputs)
+    return results
+
+def serve(path, window, max_batch_size):
+    import models
+    from batching import MicroBatcher
+
+    # Pass the backend explicitly so the server never loads remote proxies
+    generator = models.load_question_generator(models.inference_backend)
+    embedder = models.load_embedding_model(models.inference_backend)
+    batcher = MicroBatcher(
+        lambda requests: run_generation_batch(generator, requests),
+        window=window,
+        max_batch_size=max_batch_size
+    )
+
+    def handle(connection):
+        with connection:
+            while True:
+                try:
+                    operation, args, kwargs = connection.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    if operation == 'generate':
+                        result = batcher.submit((args[0], kwargs)).result()
+                    elif operation == 'encode':
+                        result = embedder.encode(*args, **kwargs)
+                    elif operation == 'stats':
+                        result = batcher.stats()
+                    else:
+                        raise ValueError(f"Unknown operation {operation!r}")
+                    connection.send(('ok', result))
+                except Exception as error:
+                    connection.send(('error', str(error)))
+
+    # Replace a stale socket from an earlier run, but never any other file
+    if os.path.lexists(path):
+        if not stat.S_ISSOCK(os.lstat(path).st_mode):
+            raise SystemExit(f"{path} exists and is not a socket; refusing to replace it")
+        os.remove(path)
+    os.umask(0o077)  # only this user may connect to the socket
+    authkey = create_authkey(path)
+    with Listener(path, family='AF_UNIX', authkey=authkey) as listener:
+        print(f"Inference server ready on {path} (backend: {models.inference_backend})")
+        while True:
+            try:
+                connection = listener.accept()
+            except Exception as error:
+                print(f"Rejected connection: {error}")
+                continue
+            threading.Thread(target=handle, args=(connection,), daemon=True).start()
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the models to web workers over a Unix socket.')
+    parser.add_argument('--socket', default=os.environ.get('INFERENCE_SOCKET', default_socket))
+    parser.add_argument('--batch-window-ms', type=float, default=float(os.environ.get('QG_BATCH_WINDOW_MS', 20)))
+    parser.add_argument('--max-batch-size', type=int, default=int(os.environ.get('QG_MAX_BATCH_SIZE', 8)))
+    args = parser.parse_args()
+    serve(args.socket, args.batch_window_ms / 1000, args.max_batch_size)
+
+if __name__ == '__main__':
+    main()
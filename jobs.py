@@ -0,0 +1,115 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+# Raised when the job queue is full; callers should retry later
+class QueueFull(Exception):
+    pass
+
+# Raised when a job does not finish within its timeout
+class JobTimeout(Exception):
+    pass
+
+class Job:
+    def __init__(self, kind, timeout):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.timeout = timeout
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.future = None
+        self.timed_out = False
+
+    @property
+    def deadline(self):
+        return self.created + self.timeout
+
+    # A job past its deadline stays timed out even if its thread finishes later
+    @property
+    def status(self):
+        if self.timed_out or (not self.future.done() and time.time() > self.deadline):
+            return 'timed_out'
+        if self.future.done():
+            return 'failed' if self.future.exception() else 'done'
+        return 'running' if self.started else 'queued'
+
+    def to_dict(self):
+        data = {"job_id": self.id, "kind": self.kind, "status": self.status}
+        if data["status"] == 'done':
+            data["result"] = self.future.result()
+        elif data["status"] == 'failed':
+            data["error"] = str(self.future.exception())
+        elif data["status"] == 'timed_out':
+            data["error"] = f"Job {self.id} timed out after {self.timeout}s"
+        return data
+
+# Bounded pool for inference jobs. At most `max_pending` jobs may be queued
+# or running at once; further submissions raise QueueFull instead of piling
+# up. A job that runs past its timeout is reported as timed out and its
+# result is discarded (running threads cannot be interrupted). Finished jobs
+# are kept for `retention` seconds so clients can poll for them.
+class JobQueue:
+    def __init__(self, max_workers=4, max_pending=32, timeout=60, retention=600):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.retention = retention
+        self.jobs = {}
+        self.pending = 0
+        self.lock = threading.Lock()
+
+    def submit(self, kind, function, *args, **kwargs):
+        job = Job(kind, self.timeout)
+
+        def run():
+            job.started = time.time()
+            try:
+                if job.started > job.deadline:
+                    raise JobTimeout(f"Job {job.id} expired before it started")
+                return function(*args, **kwargs)
+            finally:
+                job.finished = time.time()
+                job.timed_out = job.finished > job.deadline
+                with self.lock:
+                    self.pending -= 1
+
+        with self.lock:
+            self.prune()
+            if self.pending >= self.max_pending:
+                raise QueueFull(f"{self.pending} jobs already pending")
+            self.pending += 1
+            self.jobs[job.id] = job
+        job.future = self.executor.submit(run)
+        return job
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    # Block until the job finishes, `wait` seconds pass, or the job times out
+    def wait(self, job, wait=None):
+        remaining = job.deadline - time.time()
+        if wait is not None:
+            remaining = min(remaining, wait)
+        try:
+            return job.future.result(timeout=max(remaining, 0))
+        except TimeoutError:
+            if time.time() >= job.deadline:
+                raise JobTimeout(f"Job {job.id} timed out after {job.timeout}s")
+            raise
+
+    # Drop finished jobs older than the retention period (caller holds the lock)
+    def prune(self):
+        cutoff = time.time() - self.retention
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if (job.finished or job.deadline) < cutoff and (job.future is None or job.future.done())
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    def stats(self):
+        with self.lock:
+            return {"pending": self.pending, "max_pending": self.max_pending, "tracked_jobs": len(self.jobs)}
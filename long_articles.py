@@ -0,0 +1,48 @@
+import numpy as np
+
+# Function to pack consecutive sentences into windows of at most
+# `max_tokens` tokens. A single sentence longer than the budget becomes its
+# own window (the pipeline truncates it). When there are more than
+# `max_windows` windows, evenly spaced ones are kept so the cost stays
+# bounded while the whole article is still covered.
+def split_windows(sentences, token_counts, max_tokens=480, max_windows=24):
+    windows = []
+    current = []
+    current_tokens = 0
+    for sentence, tokens in zip(sentences, token_counts):
+        if current and current_tokens + tokens > max_tokens:
+            windows.append(" ".join(current))
+            current = []
+            current_tokens = 0
+        current.append(sentence)
+        current_tokens += tokens
+    if current:
+        windows.append(" ".join(current))
+
+    if len(windows) > max_windows:
+        keep = np.linspace(0, len(windows) - 1, max_windows).round().astype(int)
+        windows = [windows[i] for i in sorted(set(keep))]
+    return windows
+
+# Function to interleave per-window question lists (first question of every
+# window, then the second, ...) so the merged list spans the whole article
+def interleave(question_sets):
+    merged = []
+    for rank in range(max((len(s) for s in question_sets), default=0)):
+        merged.extend(s[rank] for s in question_sets if rank < len(s))
+    return merged
+
+# Function to drop near-duplicate questions. `embeddings` are unit-length
+# rows aligned with `questions`; a question is kept only if its cosine
+# similarity to every kept question is below `threshold`.
+def dedupe_questions(questions, embeddings, limit, threshold=0.85):
+    kept = []
+    kept_embeddings = []
+    for question, embedding in zip(questions, embeddings):
+        if kept_embeddings and float(np.max(np.asarray(kept_embeddings) @ embedding)) >= threshold:
+            continue
+        kept.append(question)
+        kept_embeddings.append(embedding)
+        if len(kept) >= limit:
+            break
+    return kept
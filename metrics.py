@@ -0,0 +1,193 @@
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Set METRICS_ENABLED=0 to turn every timer into a no-op
+enabled = os.environ.get('METRICS_ENABLED', '1') == '1'
+
+# Quantiles reported for every series
+quantiles = (0.5, 0.95, 0.99)
+
+# Latency series: total count and sum, plus a window of the most recent
+# samples from which the quantiles are computed
+class Summary:
+    def __init__(self, window=2048):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=window)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.samples.append(seconds)
+
+    def quantile(self, q):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+lock = threading.Lock()
+series = {}
+
+# Function to record one duration for a metric and label
+def observe(name, label, seconds):
+    with lock:
+        summary = series.get((name, label))
+        if summary is None:
+            summary = series[(name, label)] = Summary()
+        summary.observe(seconds)
+
+class Timer:
+    def __init__(self, name, label):
+        self.name = name
+        self.label = label
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        observe(self.name, self.label, time.perf_counter() - self.start)
+        return False
+
+class NoTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+no_timer = NoTimer()
+
+# Function to time a model stage: `with metrics.stage('encode'): ...`
+def stage(name):
+    return Timer('stage_duration_seconds', ('stage', name)) if enabled else no_timer
+
+# Function to render every series in the Prometheus text exposition format.
+# `gauges` is a list of (name, labels dict, value) tuples added as-is;
+# names ending in _total are declared as counters.
+def render(gauges=()):
+    with lock:
+        snapshot = [
+            (name, label, summary.count, summary.total, [summary.quantile(q) for q in quantiles])
+            for (name, label), summary in sorted(series.items())
+        ]
+
+    lines = []
+    declared = set()
+    for name, (key, value), count, total, values in snapshot:
+        if name not in declared:
+            lines.append(f"# TYPE {name} summary")
+            declared.add(name)
+        labels = f'{key}="{value}"'
+        for q, seconds in zip(quantiles, values):
+            lines.append(f'{name}{{{labels},quantile="{q}"}} {seconds:.6f}')
+        lines.append(f'{name}_sum{{{labels}}} {total:.6f}')
+        lines.append(f'{name}_count{{{labels}}} {count}')
+
+    for name, labels, value in gauges:
+        if name not in declared:
+            lines.append(f"# TYPE {name} {'counter' if name.endswith('_total') else 'gauge'}")
+            declared.add(name)
+        label_text = ",".join(f'{key}="{label}"' for key, label in labels.items())
+        lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+# Profiles collected for the current ?profile=1 request. Work the request
+# hands to other threads (job pool, micro-batcher) is profiled there and
+# appended here, then merged into the request's dump.
+profile_collector = contextvars.ContextVar('profile_collector', default=None)
+
+# Function to start a cProfile profiler, or return None when one cannot be
+# enabled (Python 3.12+ allows one at a time, and it already sees every thread)
+def start_profiler():
+    import cProfile
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        return None
+    return profiler
+
+# Profile the enclosed block into every collector given (none: no-op)
+@contextmanager
+def profile_into(collectors):
+    profiler = start_profiler() if collectors else None
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            for collector in collectors:
+                collector.append(profiler)
+
+# Function to wrap work handed to another thread so it is profiled there
+# when the submitting request is being profiled
+def profiled(function):
+    collector = profile_collector.get()
+    if collector is None:
+        return function
+
+    def run(*args, **kwargs):
+        token = profile_collector.set(collector)
+        try:
+            with profile_into([collector]):
+                return function(*args, **kwargs)
+        finally:
+            profile_collector.reset(token)
+    return run
+
+# Function to add request timing, /metrics and optional profiling to a Flask
+# app. With PROFILING_ENABLED=1, any request with ?profile=1 is run under
+# cProfile, together with the work it hands to profiled() threads, and the
+# merged stats are written to profile_dir.
+def init_app(app, gauges=lambda: (), profile_dir='./profiles'):
+    from flask import Response, g, request
+
+    profiling = os.environ.get('PROFILING_ENABLED', '0') == '1'
+
+    if enabled or profiling:
+        @app.before_request
+        def start_request():
+            g.metrics_start = time.perf_counter()
+            if profiling and request.args.get('profile') == '1':
+                g.profiler = start_profiler()
+                g.profiles = []
+                g.profile_token = profile_collector.set(g.profiles)
+
+        @app.after_request
+        def finish_request(response):
+            if 'profile_token' in g:
+                import pstats
+                profile_collector.reset(g.pop('profile_token'))
+                profiler = g.pop('profiler')
+                profiles = ([profiler] if profiler is not None else []) + g.pop('profiles')
+                if profiler is not None:
+                    profiler.disable()
+                if profiles:
+                    stats = pstats.Stats(profiles[0])
+                    for worker_profile in profiles[1:]:
+                        stats.add(worker_profile)
+                    os.makedirs(profile_dir, exist_ok=True)
+                    route = (request.url_rule.rule if request.url_rule else 'unmatched').strip('/').replace('/', '_')
+                    path = os.path.join(profile_dir, f"{route or 'home'}-{int(time.time() * 1000)}.prof")
+                    stats.dump_stats(path)
+                    response.headers['X-Profile'] = path
+            if enabled and 'metrics_start' in g:
+                route = request.url_rule.rule if request.url_rule else 'unmatched'
+                start = g.metrics_start
+                record = lambda: observe('request_duration_seconds', ('route', route), time.perf_counter() - start)
+                # A streamed body is produced after this hook; time it when it closes
+                if response.is_streamed:
+                    response.call_on_close(record)
+                else:
+                    record()
+            return response
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        return Response(render(gauges()), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,153 @@
+import os
+import threading
+import time
+
+# Model locations
+model_path = './models/valhalla_t5_base_qg_hl'
+embedding_model_name = 'all-MiniLM-L6-v2'
+
+# Inference backend: 'torch' (full precision), 'int8' (dynamic quantization
+# of the Linear layers) or 'onnx' (ONNX Runtime graphs exported once into
+# onnx_dir and reused afterwards)
+inference_backends = ('torch', 'int8', 'onnx')
+inference_backend = os.environ.get('INFERENCE_BACKEND', 'torch')
+onnx_dir = './models/onnx'
+
+# When set, both models are served by inference_server.py on this Unix socket
+# instead of being loaded into every web worker
+inference_socket = os.environ.get('INFERENCE_SOCKET')
+inference_client = None
+
+# Function to return the shared connection to the inference server
+def get_inference_client():
+    global inference_client
+    if inference_client is None:
+        from inference_server import InferenceClient
+        inference_client = InferenceClient(inference_socket)
+    return inference_client
+
+# A resource that is built on first use. Loading is guarded by a per-model
+# lock so concurrent requests trigger exactly one load, and attribute access
+# and calls are forwarded to the loaded object, so a LazyModel can be used
+# wherever the model itself was used before.
+class LazyModel:
+    def __init__(self, name, loader):
+        self.name = name
+        self.loader = loader
+        self.lock = threading.Lock()
+        self.instance = None
+        self.load_seconds = None
+
+    def get(self):
+        if self.instance is None:
+            with self.lock:
+                if self.instance is None:
+                    start = time.perf_counter()
+                    self.instance = self.loader()
+                    self.load_seconds = time.perf_counter() - start
+        return self.instance
+
+    @property
+    def loaded(self):
+        return self.instance is not None
+
+    def __getattr__(self, attribute):
+        # Only reached for names not set in __init__; never load for dunders
+        if attribute.startswith('__') or attribute in ('instance', 'loader', 'lock'):
+            raise AttributeError(attribute)
+        return getattr(self.get(), attribute)
+
+    def __call__(self, *args, **kwargs):
+        return self.get()(*args, **kwargs)
+
+# Function to quantize a torch model's Linear layers to int8 for CPU inference
+def quantize_int8(model):
+    import torch
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+# Function to load the T5 question generation pipeline
+def load_question_generator(backend=None):
+    if inference_socket and backend is None:
+        from inference_server import RemoteGenerator
+        return RemoteGenerator(get_inference_client(), model_path)
+    from transformers import pipeline
+    backend = backend or inference_backend
+    if backend == 'onnx':
+        from transformers import AutoTokenizer
+        from optimum.onnxruntime import ORTModelForSeq2SeqLM
+        export_path = os.path.join(onnx_dir, os.path.basename(model_path))
+        if not os.path.exists(export_path):
+            ORTModelForSeq2SeqLM.from_pretrained(model_path, export=True).save_pretrained(export_path)
+            AutoTokenizer.from_pretrained(model_path).save_pretrained(export_path)
+        return pipeline(
+            'text2text-generation',
+            model=ORTModelForSeq2SeqLM.from_pretrained(export_path),
+            tokenizer=AutoTokenizer.from_pretrained(export_path)
+        )
+    generator = pipeline('text2text-generation', model=model_path)
+    if backend == 'int8':
+        generator.model = quantize_int8(generator.model)
+    return generator
+
+# Function to load the sentence embedding model
+def load_embedding_model(backend=None):
+    if inference_socket and backend is None:
+        from inference_server import RemoteEmbedder
+        return RemoteEmbedder(get_inference_client())
+    from sentence_transformers import SentenceTransformer
+    backend = backend or inference_backend
+    if backend == 'onnx':
+        export_path = os.path.join(onnx_dir, embedding_model_name)
+        if not os.path.exists(export_path):
+            SentenceTransformer(embedding_model_name, backend='onnx').save(export_path)
+        return SentenceTransformer(export_path, backend='onnx')
+    model = SentenceTransformer(embedding_model_name)
+    if backend == 'int8':
+        model = quantize_int8(model)
+    return model
+
+if inference_backend not in inference_backends:
+    raise ValueError(f"Unknown INFERENCE_BACKEND {inference_backend!r}, expected one of {inference_backends}")
+
+question_generator = LazyModel('question_generator', load_question_generator)
+embedding_model = LazyModel('embedding_model', load_embedding_model)
+
+# Every lazily loaded resource, in warm-up order
+registry = [question_generator, embedding_model]
+
+# Function to register another lazily loaded resource (e.g. the corpus index)
+def register(resource):
+    registry.append(resource)
+    return resource
+
+warm_up_lock = threading.Lock()
+warm_up_thread = None
+
+# Function to load every registered resource, optionally in a background
+# thread. While a background warm-up is running, it is returned instead of
+# starting another one.
+def warm_up(background=True):
+    global warm_up_thread
+
+    def load_all():
+        for resource in list(registry):
+            try:
+                resource.get()
+            except Exception as error:
+                print(f"Warm-up failed for {resource.name}: {error}")
+
+    if not background:
+        load_all()
+        return None
+    with warm_up_lock:
+        if warm_up_thread is None or not warm_up_thread.is_alive():
+            warm_up_thread = threading.Thread(target=load_all, name='model-warm-up', daemon=True)
+            warm_up_thread.start()
+        return warm_up_thread
+
+# Function to report which resources are loaded and how long each took
+def status():
+    return {
+        resource.name: {"loaded": resource.loaded, "load_seconds": resource.load_seconds}
+        for resource in registry
+    }
@@ -0,0 +1,70 @@
+import os
+import metrics
+import models
+from corpus_index import CorpusIndex
+from models import question_generator, embedding_model, embedding_model_name
+
+# Model and index code shared by the web app and the offline tools. Nothing
+# here touches web-app state (ratings, job queue, caches, file watchers), so
+# batch workers can import it without side effects.
+
+# Retrieval corpus files (CSV or JSONL), comma-separated in CORPUS_SOURCES
+corpus_sources = os.environ.get('CORPUS_SOURCES', './Templates/retrieval_corpus.jsonl').split(',')
+
+# Search backend: 'exact' (partial top-k) or 'ivf' (approximate, tune with SEARCH_NPROBE)
+search_backend = os.environ.get('SEARCH_BACKEND', 'exact')
+search_options = {'nprobe': int(os.environ.get('SEARCH_NPROBE', 8))} if search_backend == 'ivf' else {}
+
+# Retrieval mode: 'dense' (MiniLM over the whole corpus) or 'hybrid' (BM25
+# candidates re-ranked by MiniLM, with configurable fusion weight)
+retrieval_mode = os.environ.get('RETRIEVAL_MODE', 'dense')
+hybrid_options = {
+    'candidates': int(os.environ.get('HYBRID_CANDIDATES', 200)),
+    'dense_weight': float(os.environ.get('HYBRID_DENSE_WEIGHT', 0.7)),
+} if retrieval_mode == 'hybrid' else None
+
+# Function to build the corpus index, encoding only documents missing from disk
+def build_corpus_index(snapshot):
+    index = CorpusIndex(
+        embedding_model,
+        f"{embedding_model_name}/{models.inference_backend}",
+        backend=search_backend,
+        hybrid=hybrid_options,
+        **search_options
+    )
+    index.build(snapshot.texts, snapshot.ids)
+    return index
+
+# Function to split an article into sentences
+def split_sentences(article):
+    from nltk.tokenize import sent_tokenize
+    with metrics.stage('sent_tokenize'):
+        return sent_tokenize(article)
+
+# Function to build the T5 prompt for an article
+def build_generation_input(article):
+    sentences = split_sentences(article)[:10]
+    context = " ".join(sentences)
+    return f"generate questions: {context}"
+
+# Function to run one padded pipeline call per distinct num_questions in a batch
+def run_generation_batch(requests):
+    results = [None] * len(requests)
+    groups = {}
+    for i, (_, num_questions) in enumerate(requests):
+        groups.setdefault(num_questions, []).append(i)
+    for num_questions, indices in groups.items():
+        with metrics.stage('generate'):
+            outputs = question_generator(
+                [requests[i][0] for i in indices],
+                max_length=64,
+                num_return_sequences=num_questions,
+                num_beams=num_questions,
+                batch_size=len(indices),
+                truncation=True
+            )
+        for i, questions in zip(indices, outputs):
+            if isinstance(questions, dict):
+                questions = [questions]
+            results[i] = [q['generated_text'] for q in questions]
+    return results
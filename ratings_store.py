@@ -0,0 +1,100 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+
+# Ratings kept in SQLite in WAL mode so every gunicorn worker can write
+# concurrently without losing updates. Each submission is a single INSERT
+# into an append-only log; compaction periodically folds old log rows into
+# a one-row summary. Each process keeps in-memory totals and only reads log
+# rows newer than the last one it has counted.
+class RatingsStore:
+    def __init__(self, db_path, legacy_json=None, compact_every=1000):
+        self.db_path = db_path
+        self.compact_every = compact_every
+        self.lock = threading.Lock()
+        self.total_ratings = 0
+        self.ratings_count = 0
+        self.last_id = 0
+        self.initialized = False
+        self.setup(legacy_json)
+
+    @contextmanager
+    def connect(self):
+        with closing(sqlite3.connect(self.db_path, timeout=30, isolation_level=None)) as connection:
+            connection.execute("PRAGMA busy_timeout = 30000")
+            yield connection
+
+    def setup(self, legacy_json):
+        with self.connect() as connection:
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS ratings_log ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, rating INTEGER NOT NULL, created REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS ratings_summary ("
+                "id INTEGER PRIMARY KEY CHECK (id = 1), total_ratings INTEGER NOT NULL, "
+                "ratings_count INTEGER NOT NULL, last_log_id INTEGER NOT NULL)"
+            )
+            exists = connection.execute("SELECT 1 FROM ratings_summary").fetchone()
+            if not exists:
+                # Carry over totals from the old ratings.json on first start
+                seed = {"total_ratings": 0, "ratings_count": 0}
+                if legacy_json and os.path.exists(legacy_json):
+                    with open(legacy_json, 'r') as file:
+                        seed.update(json.load(file))
+                connection.execute(
+                    "INSERT INTO ratings_summary VALUES (1, ?, ?, 0)",
+                    (seed["total_ratings"], seed["ratings_count"])
+                )
+            connection.execute("COMMIT")
+
+    def add(self, rating):
+        with self.connect() as connection:
+            row_id = connection.execute(
+                "INSERT INTO ratings_log (rating, created) VALUES (?, ?)", (rating, time.time())
+            ).lastrowid
+        if self.compact_every and row_id % self.compact_every == 0:
+            self.compact()
+
+    # Fold every log row into the summary row and delete it, in one transaction
+    def compact(self):
+        with self.connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            total, count, last_id = connection.execute(
+                "SELECT COALESCE(SUM(rating), 0), COUNT(*), COALESCE(MAX(id), 0) FROM ratings_log"
+            ).fetchone()
+            if count:
+                connection.execute(
+                    "UPDATE ratings_summary SET total_ratings = total_ratings + ?, "
+                    "ratings_count = ratings_count + ?, last_log_id = ? WHERE id = 1",
+                    (total, count, last_id)
+                )
+                connection.execute("DELETE FROM ratings_log WHERE id <= ?", (last_id,))
+            connection.execute("COMMIT")
+
+    # Bring the in-memory totals up to date and return them
+    def totals(self):
+        with self.lock, self.connect() as connection:
+            connection.execute("BEGIN")
+            summary_total, summary_count, summary_last = connection.execute(
+                "SELECT total_ratings, ratings_count, last_log_id FROM ratings_summary"
+            ).fetchone()
+            if not self.initialized or summary_last > self.last_id:
+                # First read, or rows we had not counted were compacted: restart from the summary
+                self.total_ratings, self.ratings_count, self.last_id = summary_total, summary_count, summary_last
+                self.initialized = True
+            total, count, last_id = connection.execute(
+                "SELECT COALESCE(SUM(rating), 0), COUNT(*), MAX(id) FROM ratings_log WHERE id > ?",
+                (self.last_id,)
+            ).fetchone()
+            connection.execute("COMMIT")
+            if count:
+                self.total_ratings += total
+                self.ratings_count += count
+                self.last_id = last_id
+            return {"total_ratings": self.total_ratings, "ratings_count": self.ratings_count}
@@ -0,0 +1,94 @@
+import numpy as np
+
+# Function to pick the k best scores without sorting the whole array
+def top_k_indices(scores, k):
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates])]
+
+# Exact search: one matrix-vector product over a contiguous float32 matrix
+# followed by a partial top-k selection.
+class ExactSearch:
+    def __init__(self, embeddings):
+        self.embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+
+    def search(self, query_embedding, top_k=3):
+        scores = self.embeddings @ np.asarray(query_embedding, dtype=np.float32)
+        indices = top_k_indices(scores, top_k)
+        return indices, scores[indices]
+
+    # Score many queries with one matrix multiply, then select per row
+    def search_many(self, query_embeddings, top_k=3):
+        scores = np.asarray(query_embeddings, dtype=np.float32) @ self.embeddings.T
+        results = []
+        for row in scores:
+            indices = top_k_indices(row, top_k)
+            results.append((indices, row[indices]))
+        return results
+
+# Approximate search with an inverted file (IVF) index. Documents are
+# clustered with spherical k-means; a query only scores the documents in
+# its `nprobe` closest clusters, so recall is traded for speed via nprobe.
+class IVFSearch:
+    def __init__(self, embeddings, nlist=None, nprobe=8, iterations=10, seed=0):
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        count = len(embeddings)
+        if nlist is None:
+            nlist = max(1, int(np.sqrt(count)))
+        self.nlist = max(1, min(nlist, count))
+        self.nprobe = nprobe
+        self.centroids = self.train(embeddings, iterations, seed)
+
+        # Group rows by cluster so each probed list is one contiguous slice
+        assignments = np.argmax(embeddings @ self.centroids.T, axis=1)
+        order = np.argsort(assignments, kind='stable')
+        self.ids = order
+        self.embeddings = np.ascontiguousarray(embeddings[order])
+        counts = np.bincount(assignments, minlength=self.nlist)
+        self.offsets = np.concatenate(([0], np.cumsum(counts)))
+
+    def train(self, embeddings, iterations, seed):
+        rng = np.random.default_rng(seed)
+        sample = embeddings
+        if len(embeddings) > self.nlist * 256:
+            sample = embeddings[rng.choice(len(embeddings), self.nlist * 256, replace=False)]
+        centroids = sample[rng.choice(len(sample), self.nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(self.nlist):
+                members = sample[assignments == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+            centroids /= np.maximum(norms, 1e-12)
+        return centroids
+
+    def search(self, query_embedding, top_k=3, nprobe=None):
+        query_embedding = np.asarray(query_embedding, dtype=np.float32)
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        probes = top_k_indices(self.centroids @ query_embedding, nprobe)
+        rows = np.concatenate([
+            np.arange(self.offsets[c], self.offsets[c + 1]) for c in probes
+        ])
+        scores = self.embeddings[rows] @ query_embedding
+        best = top_k_indices(scores, top_k)
+        return self.ids[rows[best]], scores[best]
+
+    def search_many(self, query_embeddings, top_k=3):
+        return [self.search(query, top_k) for query in query_embeddings]
+
+search_backends = {
+    'exact': ExactSearch,
+    'ivf': IVFSearch,
+}
+
+# Function to build the configured search backend over an embedding matrix
+def build_search_backend(name, embeddings, **options):
+    if name not in search_backends:
+        raise ValueError(f"Unknown search backend: {name}")
+    return search_backends[name](embeddings, **options)